@@ -6,9 +6,19 @@ RFID读写器管理软件兼容性检查
 """
 
 import sys
-import tkinter as tk
-from tkinter import messagebox
-import subprocess
+
+_messagebox = None
+
+def get_messagebox():
+    """按需导入 tkinter，创建隐藏的根窗口并返回 messagebox 模块"""
+    global _messagebox
+    if _messagebox is None:
+        import tkinter as tk
+        from tkinter import messagebox
+        root = tk.Tk()
+        root.withdraw()
+        _messagebox = messagebox
+    return _messagebox
 
 def check_python_version():
     """检查Python版本"""
@@ -23,14 +33,13 @@ def check_pyqt_compatibility():
     except ImportError:
         return False
 
-def main():
-    # 创建根窗口但不显示
-    root = tk.Tk()
-    root.withdraw()
-    
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
     # 检查Python版本
     if not check_python_version():
-        messagebox.showerror(
+        get_messagebox().showerror(
             "版本不兼容", 
             f"当前Python版本 {sys.version} 不兼容\n"
             f"RFID读写器管理软件需要Python 3.6-3.10版本\n"
@@ -40,7 +49,7 @@ def main():
         
     # 检查PyQt5兼容性
     if not check_pyqt_compatibility():
-        messagebox.showerror(
+        get_messagebox().showerror(
             "缺少依赖", 
             "无法导入PyQt5模块\n"
             "请确保已正确安装PyQt5:\n"
@@ -50,19 +59,23 @@ def main():
         
     # 尝试启动应用
     try:
-        messagebox.showinfo(
-            "兼容性检查", 
-            "兼容性检查通过！\n"
-            "现在将尝试启动应用程序...\n"
-            "如果应用程序没有显示，请检查控制台输出是否有错误信息。"
-        )
+        # 检查通过时默认只在控制台提示，不必为此导入 tkinter；传入 --notify 时仍弹窗提示
+        if "--notify" in argv:
+            get_messagebox().showinfo(
+                "兼容性检查", 
+                "兼容性检查通过！\n"
+                "现在将尝试启动应用程序...\n"
+                "如果应用程序没有显示，请检查控制台输出是否有错误信息。"
+            )
+        else:
+            print("兼容性检查通过，正在启动应用程序...")
         
         # 尝试导入并运行主程序
         import main
         return 0
         
     except Exception as e:
-        messagebox.showerror(
+        get_messagebox().showerror(
             "启动错误", 
             f"启动应用程序时出错:\n{str(e)}\n"
             f"请联系开发者获取帮助。"
@@ -4,25 +4,41 @@
 import sys
 import os # <-- 添加 os 导入
 import time
-from datetime import datetime
+import threading
+import collections
 import serial
-import serial.tools.list_ports
 import re # 添加 re 模块导入
-import binascii # 添加 binascii 模块导入
 from read_rfid_tag import construct_read_command, parse_rfid_response # 从 read_rfid_tag.py 导入 parse_rfid_response
-from read_rfid_tag import construct_write_command 
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QPushButton, QLabel, QComboBox, QLineEdit, QFormLayout, 
-    QSpinBox, QDoubleSpinBox, QTextEdit, QGroupBox, QFrame, 
-    QMessageBox, QSplitter, QScrollBar, QCheckBox
+    QSpinBox, QPlainTextEdit, QGroupBox, QMessageBox, QCheckBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QSize, QSettings
-from PyQt6.QtGui import QFont, QColor, QIcon, QPalette
+from PyQt6.QtCore import Qt, QObject, QThread, QThreadPool, pyqtSignal, QSettings, QTimer, QRegularExpression, QSignalBlocker
+from PyQt6.QtGui import QFont, QIcon, QTextCursor, QRegularExpressionValidator
 
 # 导入自定义RFID协议模块
-from rfid_protocol import RFIDProtocol
+from rfid_protocol import RFIDProtocol, TAG_DATA_MIN_LEN, decode_tag_data
+
+# 界面样式表与状态文本，统一定义为常量，避免每次调用时重复构建字符串
+_LOG_PANEL_QSS = "background-color: #F3F3F3; color: #333333; border-radius: 4px;"
+# 顶部栏和连接操作区各只设置一个样式表 ("*" 作用于该区域及其所有子控件)，
+# 子控件按 objectName 选择，不再逐个控件解析样式表
+_HEADER_QSS = (
+    "* { background-color: #1DADE5; }"
+    "QLabel#appNameLabel { color: #FFFFFF; font-size: 18px; font-weight: bold; }"
+    "QLabel#versionLabel { color: #FFFFFF; font-size: 15px; margin-top: 5px; margin-left: -3px; }"
+)
+_CONNECTION_PANEL_QSS = (
+    "* { background-color: #F5F5F5; color: black; }"
+    "QLabel#statusLabel { margin-top: -10px; margin-left: 10px; }"
+)
+_STATUS_CONNECTED_HTML = "状态： <font color='#4CAF50' style='font-size:16pt;'>●</font> 已连接"
+_STATUS_DISCONNECTED_HTML = "状态： <font color='#FF5252' style='font-size:16pt;'>●</font> 未连接"
+
+# 写入标签时字符串字段允许的字符：大小写字母、数字、空格和横杠
+_VALID_STR = re.compile(r"[a-zA-Z0-9 -]*")
 
 # Helper function to get resource path (for PyInstaller)
 def resource_path(relative_path):
@@ -34,23 +50,135 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".") # os.path.dirname(__file__) is also an option
     return os.path.join(base_path, relative_path)
 
-class LogPanel(QTextEdit):
-    """日志面板组件"""
+class LogPanel(QPlainTextEdit):
+    """日志面板组件 (纯文本控件，布局开销远小于富文本的 QTextEdit)"""
+
+    # 日志先缓存再批量写入文档：空闲时很快写入，持续高频日志时约每帧写入一次
+    FLUSH_DELAY_IDLE_MS = 2
+    FLUSH_DELAY_BUSY_MS = 16
+    MAX_PENDING = 256  # 积压超过该条数时立即写入
+    MAX_LINES = 5000  # 日志最多保留的行数，超出后自动丢弃最早的行
+    _FONT = None  # 日志字体，首次创建面板时构造 (需在 QApplication 创建之后)
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setReadOnly(True)
-        font = QFont("JetBrains Mono", 10)
-        self.setFont(font)
-        self.setStyleSheet("background-color: #F3F3F3; color: #333333; border-radius: 4px;")
+        if LogPanel._FONT is None:
+            LogPanel._FONT = QFont("JetBrains Mono", 10)
+        self.setFont(LogPanel._FONT)
+        self.setStyleSheet(_LOG_PANEL_QSS)
+        self.setMaximumBlockCount(self.MAX_LINES)
+
+        self._pending = [] # 尚未写入文档的日志行
+        self._stamp_second = -1 # 缓存的时间戳前缀对应的秒数，同一秒内的日志复用同一个前缀
+        self._stamp_prefix = ""
+        self._last_flush = 0.0
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush)
+
+        # 仅当用户停留在底部时才自动滚动，避免打断查看历史日志；
+        # 滚动由文档高度变化 (rangeChanged) 驱动，写入日志时不再操作滚动条
+        self._auto_scroll = True
+        self._scrollbar = self.verticalScrollBar() # 缓存滚动条对象，滚动回调中不再重复查找
+        self._scrollbar.valueChanged.connect(self._on_scroll_value_changed)
+        self._scrollbar.rangeChanged.connect(self._on_scroll_range_changed)
     
     def add_log(self, message):
         """添加日志信息"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        self.append(log_entry)
-        # 自动滚动到底部
-        self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        self.add_logs((message,))
+
+    def add_logs(self, messages):
+        """批量添加日志信息 (同一批日志使用同一个时间戳)"""
+        second = int(time.time())
+        if second != self._stamp_second:
+            self._stamp_second = second
+            self._stamp_prefix = time.strftime("[%Y-%m-%d %H:%M:%S] ", time.localtime(second))
+        prefix = self._stamp_prefix
+        self._pending.extend(prefix + message for message in messages)
+
+        if len(self._pending) > self.MAX_PENDING:
+            self._flush()
+        elif not self._flush_timer.isActive():
+            busy = time.monotonic() - self._last_flush < self.FLUSH_DELAY_BUSY_MS / 1000
+            self._flush_timer.start(self.FLUSH_DELAY_BUSY_MS if busy else self.FLUSH_DELAY_IDLE_MS)
+
+    def _flush(self):
+        """将缓存的日志行一次性写入文档"""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        text = "\n".join(self._pending)
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+
+        # 直接在文档末尾插入纯文本，不改变用户的选区
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text if self.document().isEmpty() else "\n" + text)
+
+    def _on_scroll_value_changed(self, value):
+        """记录用户是否停留在底部"""
+        self._auto_scroll = value == self._scrollbar.maximum()
+
+    def _on_scroll_range_changed(self, minimum, maximum):
+        """文档高度变化时，若之前停留在底部则跟随到新的底部"""
+        if self._auto_scroll:
+            self._scrollbar.setValue(maximum)
+
+    def clear(self):
+        """清空日志，同时丢弃尚未写入的日志行"""
+        self._pending.clear()
+        super().clear()
+
+
+class LogQueue:
+    """
+    跨线程传递日志的队列：emit() 只把日志放入队列，仅在队列由空变为非空时调用一次 notify，
+    界面线程收到通知后用 drain() 一次取走全部日志，突发的大量日志只产生一次跨线程事件。
+    """
+
+    def __init__(self, notify):
+        self._messages = collections.deque()
+        self._notified = False
+        self._notify = notify
+
+    def emit(self, message):
+        """放入一条日志 (可在任意线程调用)"""
+        self._messages.append(message)
+        if not self._notified:
+            self._notified = True
+            self._notify()
+
+    def drain(self) -> list:
+        """取出当前队列中的全部日志"""
+        self._notified = False # 先清除标记，取出期间新到的日志会再次触发通知
+        messages = []
+        while self._messages:
+            messages.append(self._messages.popleft())
+        return messages
+
+
+class PortScanner(QObject):
+    """
+    在线程池中枚举串口，结果通过 finished 信号排队交给界面线程。
+    (不依附于主窗口，窗口关闭时仍在进行的枚举不会向已销毁的窗口发信号)
+    """
+
+    finished = pyqtSignal(object) # 枚举到的串口集合，失败时为 None
+
+    def run(self):
+        """枚举串口 (在线程池中执行)"""
+        try:
+            # 按需导入：枚举模块 (Windows 上会加载 SetupAPI 相关绑定) 不拖慢程序启动，且在工作线程中加载；
+            # 导入失败也要发出 finished，否则界面会一直认为枚举仍在进行
+            from serial.tools import list_ports
+            # 排除 COM1
+            ports = {port.device for port in list_ports.comports()
+                     if port.device.upper() != "COM1"}
+        except Exception:
+            ports = None
+        self.finished.emit(ports)
 
 
 class RFIDReaderThread(QThread):
@@ -58,47 +186,91 @@ class RFIDReaderThread(QThread):
     
     # 定义信号
     status_changed = pyqtSignal(bool, str)
-    data_received = pyqtSignal(dict)
-    log_message = pyqtSignal(str)
+    data_received = pyqtSignal(bytes) # 原始标签数据，由界面线程解码
+    log_messages = pyqtSignal(list) # 批量日志，在界面线程中发出
+    _logs_ready = pyqtSignal() # 日志队列由空变为非空
     continuous_action_status_changed = pyqtSignal(bool, str) # active, mode ('read', 'write', or '')
     about_to_read_in_loop = pyqtSignal() # 新增信号，用于在连续读取循环中通知UI清空表单
     
+    JOB_QUEUE_SIZE = 64 # 待执行单次操作的最大积压数量
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.serial_port = None
         self.is_running = False
         self.port_name = ""
         self.baud_rate = 115200
+        # 日志先进入队列，界面线程每次取走全部积压的日志，而不是每行日志一个跨线程信号
+        # (本对象属于界面线程，工作线程发出的 _logs_ready 会排队到界面线程处理)
+        self.log_message = LogQueue(self._logs_ready.emit)
+        self._logs_ready.connect(self._drain_logs)
         self.rfid_protocol = RFIDProtocol(log_emitter=self.log_message)
+        self._stop = threading.Event() # 断开连接时置位，立即唤醒连续操作之间的等待
+        # 界面提交的单次操作队列，由线程主循环依次执行，界面线程提交后立即返回，不再等待串口往返
+        # (积压达到 JOB_QUEUE_SIZE 时拒绝新的请求并记录日志，已排队的请求不会被丢弃)
+        self._jobs = collections.deque()
         
         # 连续操作相关状态
         self.is_performing_continuous_action = False
         self.continuous_mode = None  # 'read' or 'write'
         self.continuous_action_channel = None
         self.continuous_action_data = None
+        self.continuous_action_command = None # 连续写入的命令帧，开始时构建一次，每次循环直接发送
         self.CONTINUOUS_INTERVAL = 0.5  # 连续操作的间隔时间（秒）
+        self.CONTINUOUS_MIN_WAIT = 0.05  # 连续操作之间的最短等待（秒），操作超时后仍给读写器留出空闲时间
+        self.READ_TIMEOUT = 0.05  # 串口读超时（秒）
+        self.WRITE_TIMEOUT = 0.2  # 串口写超时（秒），设备不接收数据时写入不会无限阻塞
+        self.SERIAL_BUFFER_SIZE = 65536  # Windows 串口驱动收发缓冲区大小（字节）
         
+    def _drain_logs(self):
+        """在界面线程中取走积压的日志并一次性发出"""
+        messages = self.log_message.drain()
+        if messages:
+            self.log_messages.emit(messages)
+
     def connect_reader(self, port_name, baud_rate=115200):
-        """连接RFID读写器"""
+        """连接RFID读写器 (在读写线程中打开串口，立即返回，结果通过 status_changed 通知)"""
+        self.port_name = port_name
+        self.baud_rate = baud_rate
+        self._stop.clear()
+        self._jobs.clear()
+        self.is_running = True
+        self.start()  # 启动线程，串口在 run() 中打开，打开期间界面不被阻塞
+        return True
+
+    def _open_port(self):
+        """打开串口并配置协议模块 (在读写线程中调用)，成功返回 True"""
+        port_name = self.port_name
+        baud_rate = self.baud_rate
         try:
-            self.port_name = port_name
-            self.baud_rate = baud_rate
-            
             # 尝试打开串口
+            # 使用较短的读超时，接收循环在无数据时最多阻塞一个超时周期，数据到达即被唤醒
             self.serial_port = serial.Serial(
                 port=port_name,
                 baudrate=baud_rate,
-                timeout=1
+                timeout=self.READ_TIMEOUT,
+                write_timeout=self.WRITE_TIMEOUT
             )
             
             if self.serial_port.is_open:
-                self.is_running = True
+                if sys.platform == "win32":
+                    # Windows 驱动默认接收缓冲区只有 4096 字节，界面卡顿时连续帧可能溢出丢失
+                    self.serial_port.set_buffer_size(rx_size=self.SERIAL_BUFFER_SIZE,
+                                                     tx_size=self.SERIAL_BUFFER_SIZE)
+                elif sys.platform.startswith("linux"):
+                    # USB 转串口芯片 (如 FTDI) 默认延迟定时器为 16ms，每次收发往返都可能多等一个周期；
+                    # 低延迟模式让驱动立即上报收到的数据。部分驱动 (或虚拟串口) 不支持，忽略即可
+                    try:
+                        self.serial_port.set_low_latency_mode(True)
+                    except (ValueError, OSError):
+                        pass
                 # 设置RFID协议模块的串口
                 self.rfid_protocol.set_serial(self.serial_port)
+                self.rfid_protocol.set_reader(self._read_exactly)
+                self.rfid_protocol.set_stop_event(self._stop) # 断开连接时协议层立即放弃等待响应
                 
                 self.status_changed.emit(True, f"已连接 {port_name}，波特率 {baud_rate}")
                 self.log_message.emit(f"已连接 {port_name}，波特率 {baud_rate}")
-                self.start()  # 启动线程
                 return True
             else:
                 self.status_changed.emit(False, "连接失败")
@@ -113,83 +285,121 @@ class RFIDReaderThread(QThread):
     def disconnect_reader(self):
         """断开RFID读写器连接"""
         self.is_running = False
+        self._stop.set()
         self.stop_continuous_action() #确保停止连续操作
+        self._wake() # 中断阻塞中的串口读取，使主循环立即退出
+        self.wait() # 等待线程主循环退出，此后串口不再被线程访问，可以安全关闭
         if self.serial_port and self.serial_port.is_open:
             self.serial_port.close()
             self.status_changed.emit(False, "已断开连接")
             self.log_message.emit("已断开读写器连接")
-            
-    def run(self):
-        """线程主循环"""
-        while self.is_running:
-            if self.is_performing_continuous_action and self.serial_port and self.serial_port.is_open:
-                try:
-                    if self.continuous_mode == 'read':
-                        self.about_to_read_in_loop.emit() # 在执行读取前发射信号
-                        self._execute_read_tag_once(self.continuous_action_channel, is_continuous_op=True)
-                    elif self.continuous_mode == 'write':
-                        if self.continuous_action_data: # 确保有数据可写
-                            self._execute_write_tag_once(self.continuous_action_data, self.continuous_action_channel, is_continuous_op=True)
-                    time.sleep(self.CONTINUOUS_INTERVAL)
-                except Exception as e:
-                    self.log_message.emit(f"连续操作中发生错误: {str(e)}")
-                    self.stop_continuous_action() # 发生错误时停止连续操作
-            else:
-                # 即使不进行连续操作，也保持线程的响应性
-                time.sleep(0.1)
-            
-    def _parse_raw_tag_data(self, raw_data: bytes) -> dict:
-        """将原始标签字节数据解析为字典"""
-        parsed_data = {}
-        if not raw_data or len(raw_data) < 76: # 假设主要数据至少76字节
-            self.log_message.emit(f"原始标签数据过短或为空，无法解析: {raw_data}")
-            return {} # 返回空字典，避免后续错误
 
+    def run(self):
+        """线程主循环：执行排队的单次操作和连续操作，空闲时接收串口数据"""
+        if not self._open_port():
+            self.is_running = False
+            self._jobs.clear() # 连接失败，丢弃打开串口期间提交的操作
+            self.stop_continuous_action()
+            return
         try:
-            # 按照假定的数据结构解析
-            # Tag Version (2 bytes, uint16)
-            parsed_data['tag_version'] = int.from_bytes(raw_data[0:2], 'big') # 假设大端字节序
-
-            # Filament Manufacturer (16 bytes, ASCII)
-            parsed_data['filament_manufacturer'] = raw_data[2:18].decode('ascii', errors='ignore').strip('\x00').strip()
-
-            # Material Name (16 bytes, ASCII)
-            parsed_data['material_name'] = raw_data[18:34].decode('ascii', errors='ignore').strip('\x00').strip()
-
-            # Color Name (32 bytes, ASCII)
-            parsed_data['color_name'] = raw_data[34:66].decode('ascii', errors='ignore').strip('\x00').strip()
+            while self.is_running:
+                if self._jobs:
+                    job, args = self._jobs.popleft()
+                    try:
+                        job(*args)
+                    except Exception as e:
+                        self.log_message.emit(f"执行操作时发生错误: {str(e)}")
+                elif self.is_performing_continuous_action and self.serial_port and self.serial_port.is_open:
+                    try:
+                        started = time.monotonic()
+                        if self.continuous_mode == 'read':
+                            self.about_to_read_in_loop.emit() # 在执行读取前发射信号
+                            self._execute_read_tag_once(self.continuous_action_channel, is_continuous_op=True)
+                        elif self.continuous_mode == 'write':
+                            if self.continuous_action_data: # 确保有数据可写
+                                self._execute_write_tag_once(self.continuous_action_data, self.continuous_action_channel, is_continuous_op=True,
+                                                             command=self.continuous_action_command)
+                        # 间隔从本次操作开始计算，扣除收发耗时，使连续操作的周期稳定在 CONTINUOUS_INTERVAL
+                        elapsed = time.monotonic() - started
+                        self._stop.wait(max(self.CONTINUOUS_MIN_WAIT, self.CONTINUOUS_INTERVAL - elapsed)) # 可被 disconnect_reader 立即打断
+                    except Exception as e:
+                        self.log_message.emit(f"连续操作中发生错误: {str(e)}")
+                        self.stop_continuous_action() # 发生错误时停止连续操作
+                else:
+                    # 空闲时阻塞读取串口，数据到达后立即处理
+                    self._receive_pending_frames()
+        except Exception as e:
+            # 异常不能逃出 run()，否则 PyQt6 会直接终止整个程序
+            self._abort_connection(f"读写线程发生错误: {str(e)}")
+
+    def _read_exactly(self, n, timeout):
+        """读取 n 个字节，直到读满、超过截止时间或断开连接，返回实际读到的字节"""
+        deadline = time.monotonic() + timeout
+        data = self.serial_port.read(n)
+        if len(data) >= n or time.monotonic() >= deadline or self._stop.is_set():
+            return data # 常见情况：一次读满，直接交给协议层的接收缓冲区，不再经过中间缓冲
+        buf = bytearray(data)
+        while len(buf) < n and time.monotonic() < deadline and not self._stop.is_set():
+            buf += self.serial_port.read(n - len(buf))
+        return buf # 协议层只会把它追加到接收缓冲区，无需再转换为 bytes
+
+    def _wake(self):
+        """中断线程主循环中正在阻塞的串口读取，使其立即处理新的请求"""
+        if self.serial_port and self.serial_port.is_open:
+            self.serial_port.cancel_read()
 
-            # Diameter (Target) (2 bytes, uint16)
-            parsed_data['diameter_target'] = int.from_bytes(raw_data[66:68], 'big')
+    def _submit(self, job, *args):
+        """将单次操作放入队列并唤醒线程主循环 (可在界面线程中调用)，队列已满时返回 False"""
+        if len(self._jobs) >= self.JOB_QUEUE_SIZE:
+            self.log_message.emit(f"待执行的操作过多 ({len(self._jobs)} 个)，本次请求未执行，请稍后重试")
+            return False
+        self._jobs.append((job, args))
+        self._wake()
+        return True
 
-            # Weight (Nominal, grams) (2 bytes, uint16)
-            parsed_data['weight_nominal'] = int.from_bytes(raw_data[68:70], 'big')
+    def _receive_pending_frames(self):
+        """读取串口中已到达的数据 (无数据时最多阻塞一个读超时周期)，并分发其中的完整帧"""
+        if self._jobs or not self.is_running or not self.serial_port or not self.serial_port.is_open:
+            return
+        try:
+            chunk = self.rfid_protocol.read_available()
+        except (serial.SerialException, OSError) as e:
+            # 设备拔出时 POSIX 上 in_waiting 会直接抛出 OSError (EIO)，而不是 SerialException
+            self._abort_connection(f"串口读取错误: {str(e)}")
+            return
+        frames = self.rfid_protocol.feed(chunk) if chunk else []
 
-            # Print Temp (C) (2 bytes, uint16)
-            parsed_data['print_temp'] = int.from_bytes(raw_data[70:72], 'big')
+        for frame in frames:
+            self._handle_unsolicited_frame(frame)
 
-            # Bed Temp (C) (2 bytes, uint16)
-            parsed_data['bed_temp'] = int.from_bytes(raw_data[72:74], 'big')
-            
-            # Density (2 bytes, uint16)
-            parsed_data['density'] = int.from_bytes(raw_data[74:76], 'big')
-            
-            # Serial Number (16 bytes, ASCII)
-            parsed_data['serial_number'] = raw_data[76:92].decode('ascii', errors='replace').rstrip('\x00')
-            
-            # Empty Spool Weight (2 bytes, uint16)
-            parsed_data['empty_spool_weight'] = int.from_bytes(raw_data[92:94], 'big')
+    def _abort_connection(self, reason):
+        """串口出错时断开连接 (在读写线程中调用)：退出主循环，丢弃排队的操作并关闭串口"""
+        self.is_running = False
+        self._jobs.clear()
+        self.stop_continuous_action()
+        try:
+            self.serial_port.close()
+        except (serial.SerialException, OSError):
+            pass
+        self.status_changed.emit(False, reason)
+        self.log_message.emit(f"{reason}，已断开连接")
+
+    def _handle_unsolicited_frame(self, frame: bytes):
+        """处理空闲时收到的帧 (例如超时后才到达的读取响应)"""
+        self.log_message.emit(f"收到未请求的响应帧: {frame.hex().upper()}")
+        if frame[2] != 0x11: # 仅读取响应携带标签数据
+            return
+        tag_content_bytes = parse_rfid_response(frame)
+        if tag_content_bytes:
+            self._emit_tag_data(tag_content_bytes)
             
-            # 其他可选字段可以继续添加在这里
-            # 剩余字节 (94:112) 为其他可选字段或保留字段
-
-            self.log_message.emit("标签数据解析成功")
-            return parsed_data
-
-        except Exception as e:
-            self.log_message.emit(f"解析标签数据时出错: {str(e)}")
-            return {}
-
+    def _emit_tag_data(self, tag_content_bytes: bytes) -> bool:
+        """将标签数据原样发送给界面线程解码，数据过短无法解码时返回 False"""
+        if len(tag_content_bytes) < TAG_DATA_MIN_LEN:
+            self.log_message.emit(f"原始标签数据过短或为空，无法解析: {tag_content_bytes}")
+            return False
+        self.data_received.emit(bytes(tag_content_bytes))
+        return True
 
     def _execute_read_tag_once(self, channel, is_continuous_op=False):
         """执行单次标签读取的核心逻辑"""
@@ -198,7 +408,7 @@ class RFIDReaderThread(QThread):
         # 构建并记录待发送的读取命令
         command_to_send = construct_read_command(channel)
         if command_to_send:
-            self.log_message.emit(f"准备发送读取命令 (通道 {channel + 1}): {binascii.hexlify(command_to_send).decode('ascii').upper()}")
+            self.log_message.emit(f"准备发送读取命令 (通道 {channel + 1}): {command_to_send.hex().upper()}")
         else:
             self.log_message.emit(f"错误: 无法为通道 {channel + 1} 构建读取命令。操作中止。")
             return False
@@ -211,27 +421,7 @@ class RFIDReaderThread(QThread):
             
             if success:
                 if isinstance(result_from_protocol, bytes): # 确保是字节串
-                    raw_response_frame = result_from_protocol
-                    self.log_message.emit(f"接收到原始响应帧 (通道 {channel + 1}): {binascii.hexlify(raw_response_frame).decode('ascii').upper()}")
-
-                    # 使用从 read_rfid_tag.py 导入的 parse_rfid_response 解析原始帧
-                    tag_content_bytes = parse_rfid_response(raw_response_frame)
-                    
-                    if tag_content_bytes is not None: # parse_rfid_response 成功解析并提取了数据部分 (可能为空字节串)
-                        if tag_content_bytes: # 如果提取的数据部分不为空
-                            parsed_data_dict = self._parse_raw_tag_data(tag_content_bytes)
-                            if parsed_data_dict:
-                                self.data_received.emit(parsed_data_dict)
-                                self.log_message.emit(f"成功{prefix}读取通道 {channel+1}: 已解析标签内容。")
-                            else:
-                                self.log_message.emit(f"成功{prefix}读取通道 {channel+1}: 标签内容提取成功，但解析为字典失败。内容: {binascii.hexlify(tag_content_bytes).decode('ascii')}")
-                        else: # tag_content_bytes 是 b'' (例如，STA=0x00 但无数据内容)
-                            self.log_message.emit(f"成功{prefix}读取通道 {channel+1}: 响应成功，但标签数据内容为空。")
-                        return True # 操作成功，即使数据为空或解析字典失败，但协议层面成功
-                    else: # parse_rfid_response 返回 None (表示帧错误、校验失败、或STA指示无标签等)
-                          # parse_rfid_response 内部会打印具体原因
-                        self.log_message.emit(f"{prefix}读取通道 {channel+1}: 响应帧解析失败或指示无标签/错误。")
-                        return False # 操作失败
+                    return self._handle_read_response(result_from_protocol, channel, prefix)
                 else:
                     # 这不应该发生，因为 rfid_protocol.read_tag(channel) 在成功时保证返回 bytes
                     self.log_message.emit(f"{prefix}读取通道 {channel+1} 成功，但协议层返回数据类型非字节: {type(result_from_protocol)}")
@@ -244,24 +434,45 @@ class RFIDReaderThread(QThread):
             self.log_message.emit(f"{prefix}读取通道 {channel+1} 标签时发生顶层异常: {str(e)}")
             return False
 
+    def _handle_read_response(self, raw_response_frame: bytes, channel, prefix=""):
+        """记录并解析一个读取响应帧，提取出标签内容时发送 data_received"""
+        self.log_message.emit(f"接收到原始响应帧 (通道 {channel + 1}): {raw_response_frame.hex().upper()}")
+
+        # 使用从 read_rfid_tag.py 导入的 parse_rfid_response 解析原始帧
+        tag_content_bytes = parse_rfid_response(raw_response_frame)
+
+        if tag_content_bytes is not None: # parse_rfid_response 成功解析并提取了数据部分 (可能为空字节串)
+            if tag_content_bytes: # 如果提取的数据部分不为空
+                if self._emit_tag_data(tag_content_bytes):
+                    self.log_message.emit(f"成功{prefix}读取通道 {channel+1}: 已获取标签内容。")
+                else:
+                    self.log_message.emit(f"成功{prefix}读取通道 {channel+1}: 标签内容提取成功，但数据过短无法解析。内容: {tag_content_bytes.hex()}")
+            else: # tag_content_bytes 是 b'' (例如，STA=0x00 但无数据内容)
+                self.log_message.emit(f"成功{prefix}读取通道 {channel+1}: 响应成功，但标签数据内容为空。")
+            return True # 操作成功，即使数据为空或解析字典失败，但协议层面成功
+        else: # parse_rfid_response 返回 None (表示帧错误、校验失败、或STA指示无标签等)
+              # parse_rfid_response 内部会打印具体原因
+            self.log_message.emit(f"{prefix}读取通道 {channel+1}: 响应帧解析失败或指示无标签/错误。")
+            return False # 操作失败
+
     def read_tag(self, channel):
-        """读取标签信息 (单次操作)"""
-        if not self.serial_port or not self.serial_port.is_open:
+        """读取标签信息 (单次操作，放入队列由线程执行)"""
+        if not self.is_running:
             self.log_message.emit("读写器未连接，无法读取标签")
             return False
         
         self.log_message.emit(f"正在读取通道 {channel+1} 标签...")
-        return self._execute_read_tag_once(channel, is_continuous_op=False)
+        return self._submit(self._execute_read_tag_once, channel)
             
-    def _execute_write_tag_once(self, data, channel, is_continuous_op=False):
-        """执行单次标签写入的核心逻辑"""
+    def _execute_write_tag_once(self, data, channel, is_continuous_op=False, command=None):
+        """执行单次标签写入的核心逻辑 (command 为预先构建的命令帧，为 None 时由协议层根据 data 构建)"""
         prefix = "连续" if is_continuous_op else ""
         
         # "正在写入..." 日志由调用方 (单次写入方法或开始连续写入方法) 处理
 
         # 执行实际的写入操作
         try:
-            success, message = self.rfid_protocol.write_tag(data, channel)
+            success, message = self.rfid_protocol.write_tag(data, channel, command)
             
             if success:
                 self.log_message.emit(f"成功{prefix}写入通道 {channel+1} 标签: {message}")
@@ -274,17 +485,17 @@ class RFIDReaderThread(QThread):
             return False
 
     def write_tag(self, data, channel):
-        """写入标签信息 (单次操作)"""
-        if not self.serial_port or not self.serial_port.is_open:
+        """写入标签信息 (单次操作，放入队列由线程执行)"""
+        if not self.is_running:
             self.log_message.emit("读写器未连接，无法写入标签")
             return False
             
         self.log_message.emit(f"正在写入通道 {channel+1} 标签...")
-        return self._execute_write_tag_once(data, channel, is_continuous_op=False)
+        return self._submit(self._execute_write_tag_once, data, channel)
 
     def start_continuous_read(self, channel):
         """开始连续读取"""
-        if not self.serial_port or not self.serial_port.is_open:
+        if not self.is_running:
             self.log_message.emit("读写器未连接，无法开始连续读取")
             return
 
@@ -299,16 +510,21 @@ class RFIDReaderThread(QThread):
 
     def start_continuous_write(self, data, channel):
         """开始连续写入"""
-        if not self.serial_port or not self.serial_port.is_open:
+        if not self.is_running:
             self.log_message.emit("读写器未连接，无法开始连续写入")
             return
 
         if self.is_performing_continuous_action and self.continuous_mode == 'read':
             self.stop_continuous_action() # 如果正在连续读取，则停止
 
+        try:
+            command = self.rfid_protocol.construct_write_command(data, channel)
+        except Exception:
+            command = None # 数据无法编码时每次写入由协议层报告错误
         self.is_performing_continuous_action = True
         self.continuous_mode = 'write'
         self.continuous_action_data = data
+        self.continuous_action_command = command
         self.continuous_action_channel = channel
         self.log_message.emit(f"开始连续写入通道 {channel+1}...")
         self.continuous_action_status_changed.emit(True, 'write')
@@ -322,6 +538,7 @@ class RFIDReaderThread(QThread):
             self.continuous_mode = None
             self.continuous_action_channel = None
             self.continuous_action_data = None
+            self.continuous_action_command = None
             self.continuous_action_status_changed.emit(False, '')
 
 
@@ -329,6 +546,8 @@ class RFIDReaderApp(QMainWindow):
     """RFID读写器应用主窗口"""
     
     APP_VERSION = "v0.0.1"  # 添加软件版本号
+    PORT_SCAN_CACHE_SEC = 0.5  # 串口枚举结果缓存时间(秒)
+    PORT_POLL_INTERVAL_MS = 2000  # 未连接时后台检测串口插拔的间隔(毫秒)
 
     # 定义耗材模板数据
     DEFAULT_MATERIAL_TEMPLATES = {
@@ -421,13 +640,29 @@ class RFIDReaderApp(QMainWindow):
         self.setMinimumSize(1000, 700)
         self.resize(1440, 900)
         
+        # 上次枚举到的串口及枚举时间，用于增量刷新串口列表
+        self._last_ports = set()
+        self._ports_scanned_at = float('-inf')
+        self._port_scan_pending = False # 后台串口枚举进行中
+        self._port_scan_manual = False # 本次枚举由用户点击刷新触发，完成后记录串口数量
+        self._port_scanner = PortScanner()
+        self._port_scanner.finished.connect(self._apply_ports)
+        # 定时后台枚举串口，插拔设备后无需手动刷新
+        self._port_poll_timer = QTimer(self)
+        self._port_poll_timer.timeout.connect(self._poll_ports)
+        self._port_poll_timer.start(self.PORT_POLL_INTERVAL_MS)
+        self._shown_connected = False # 界面当前显示的连接状态
+        self._skip_write_confirm = False # 本次连接中单次写入不再弹出确认框
+        
         # 初始化RFID读写器线程
         self.reader_thread = RFIDReaderThread()
-        self.reader_thread.status_changed.connect(self.update_status)
-        self.reader_thread.data_received.connect(self.update_form_data)
-        self.reader_thread.log_message.connect(self.add_log)
-        self.reader_thread.continuous_action_status_changed.connect(self.on_continuous_action_status_changed)
-        self.reader_thread.about_to_read_in_loop.connect(self.clear_tag_form) # 连接新信号到清空表单方法
+        # 由工作线程发出的信号显式使用排队连接，不必在每次发射时判断接收者所在线程
+        queued = Qt.ConnectionType.QueuedConnection
+        self.reader_thread.status_changed.connect(self.update_status, queued)
+        self.reader_thread.data_received.connect(self.on_tag_data_received, queued)
+        self.reader_thread.log_messages.connect(self.add_logs) # 在界面线程中发出，直接调用
+        self.reader_thread.continuous_action_status_changed.connect(self.on_continuous_action_status_changed, queued)
+        self.reader_thread.about_to_read_in_loop.connect(self.clear_tag_form, queued) # 连接新信号到清空表单方法
         
         # 设置主界面
         self.setup_ui()
@@ -474,18 +709,18 @@ class RFIDReaderApp(QMainWindow):
         """设置顶部栏"""
         self.header_widget = QWidget()
         self.header_widget.setFixedHeight(60)
-        self.header_widget.setStyleSheet("background-color: #1DADE5;")
+        self.header_widget.setStyleSheet(_HEADER_QSS)
         
         header_layout = QHBoxLayout(self.header_widget)
         header_layout.setContentsMargins(20, 0, 20, 0)
         
         # 应用名称标签
         app_name_label = QLabel("RFID 读写器管理软件")
-        app_name_label.setStyleSheet("color: #FFFFFF; font-size: 18px; font-weight: bold;")
+        app_name_label.setObjectName("appNameLabel")
         
         # 添加版本号标签
         version_label = QLabel(f"{self.APP_VERSION}")
-        version_label.setStyleSheet("color: #FFFFFF; font-size: 15px; margin-top: 5px; margin-left: -3px;")
+        version_label.setObjectName("versionLabel")
 
         header_layout.addWidget(app_name_label)
         header_layout.addWidget(version_label) # 将版本号标签添加到应用名称后面
@@ -495,43 +730,39 @@ class RFIDReaderApp(QMainWindow):
         """设置连接操作区"""
         self.connection_widget = QWidget()
         self.connection_widget.setFixedHeight(60)
-        self.connection_widget.setStyleSheet("background-color: #F5F5F5;")
+        self.connection_widget.setStyleSheet(_CONNECTION_PANEL_QSS)
         
         connection_layout = QHBoxLayout(self.connection_widget)
         connection_layout.setContentsMargins(20, 0, 20, 0)
         
         # 端口选择下拉框
         port_label = QLabel("端口:")
-        port_label.setStyleSheet("color: black;")
         self.port_combo = QComboBox()
-        self.port_combo.setStyleSheet("color: black;")
-        self.refresh_ports()
+        # 串口枚举较慢 (Windows 上需遍历注册表)，推迟到事件循环启动、窗口显示之后再进行
+        QTimer.singleShot(0, self.refresh_ports)
         self.port_combo.setMinimumWidth(150)
         
         # 波特率下拉框
         baud_label = QLabel("波特率:")
-        baud_label.setStyleSheet("color: black;")
         self.baud_combo = QComboBox()
-        self.baud_combo.setStyleSheet("color: black;")
-        self.baud_combo.addItems(["9600", "19200", "38400", "57600", "115200"])
+        for baud_rate in (9600, 19200, 38400, 57600, 115200):
+            self.baud_combo.addItem(str(baud_rate), baud_rate) # 数值存为条目数据，连接时无需再解析文本
         self.baud_combo.setCurrentText("115200")
         self.baud_combo.setFixedWidth(100)
         
         # 刷新按钮
         refresh_btn = QPushButton("刷新")
-        refresh_btn.setStyleSheet("color: black;")
         refresh_btn.setFixedWidth(80)
         refresh_btn.clicked.connect(self.refresh_ports)
         
         # 连接/断开按钮
         self.connect_btn = QPushButton("连接")
-        self.connect_btn.setStyleSheet("color: black;")
         self.connect_btn.setFixedWidth(80)
         self.connect_btn.clicked.connect(self.toggle_connection)
         
         # 状态标签
-        self.status_label = QLabel("状态： <font color='#FF5252' style='font-size:16pt;'>●</font> 未连接")
-        self.status_label.setStyleSheet("color: black; margin-top: -10px; margin-left: 10px;")
+        self.status_label = QLabel(_STATUS_DISCONNECTED_HTML)
+        self.status_label.setObjectName("statusLabel")
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignVCenter)
         
         # 添加到布局
@@ -546,24 +777,20 @@ class RFIDReaderApp(QMainWindow):
         
         # 添加读写按钮
         self.continuous_read_checkbox = QCheckBox("连续读取")
-        self.continuous_read_checkbox.setStyleSheet("color: black;")
         self.continuous_read_checkbox.stateChanged.connect(
             lambda state: self.handle_continuous_checkbox_changed(state, 'read')
         )
         
         self.read_button = QPushButton("读取标签")
-        self.read_button.setStyleSheet("color: black;")
         self.read_button.setFixedWidth(100)
         self.read_button.clicked.connect(self.read_tag)
         
         self.continuous_write_checkbox = QCheckBox("连续写入")
-        self.continuous_write_checkbox.setStyleSheet("color: black;")
         self.continuous_write_checkbox.stateChanged.connect(
             lambda state: self.handle_continuous_checkbox_changed(state, 'write')
         )
         
         self.write_button = QPushButton("写入标签")
-        self.write_button.setStyleSheet("color: black;")
         self.write_button.setFixedWidth(100)
         self.write_button.clicked.connect(self.write_tag)
 
@@ -574,7 +801,6 @@ class RFIDReaderApp(QMainWindow):
 
         # 添加清空日志按钮
         self.clear_logs_btn = QPushButton("清空日志")
-        self.clear_logs_btn.setStyleSheet("color: black;")
         self.clear_logs_btn.setFixedWidth(100)
         self.clear_logs_btn.clicked.connect(self.clear_log_panel)
         connection_layout.addWidget(self.clear_logs_btn)
@@ -609,7 +835,10 @@ class RFIDReaderApp(QMainWindow):
         form_layout.addRow(QLabel("标签版本:"), self.tag_version_spin)
 
         # Filament Manufacturer
+        # 输入时即拒绝不允许的字符 (与写入前的 _VALID_STR 校验使用同一规则)
+        text_validator = QRegularExpressionValidator(QRegularExpression(_VALID_STR.pattern), self)
         self.filament_manufacturer_edit = QLineEdit()
+        self.filament_manufacturer_edit.setValidator(text_validator)
         self.filament_manufacturer_edit.setMaxLength(16) # Max 16 bytes, assuming mostly ASCII
         self.filament_manufacturer_edit.setText("MINGDA 3D")  # 设置默认值
         self.filament_manufacturer_edit.setToolTip("耗材制造商 (最多16字符)")
@@ -617,6 +846,7 @@ class RFIDReaderApp(QMainWindow):
 
         # Material Name
         self.material_name_edit = QLineEdit()
+        self.material_name_edit.setValidator(text_validator)
         self.material_name_edit.setMaxLength(16) # Max 16 bytes
         self.material_name_edit.setText("PLA-HF")  # 设置默认值
         self.material_name_edit.setToolTip("材料名称 (例如: PLA, ABS, PETG, 最多16字符)")
@@ -624,6 +854,7 @@ class RFIDReaderApp(QMainWindow):
 
         # Color Name
         self.color_name_edit = QLineEdit()
+        self.color_name_edit.setValidator(text_validator)
         self.color_name_edit.setMaxLength(32) # Max 32 bytes
         self.color_name_edit.setText("Gray")  # 设置默认值
         self.color_name_edit.setToolTip("颜色名称 (最多32字符)")
@@ -696,6 +927,42 @@ class RFIDReaderApp(QMainWindow):
         
         # 设置表单布局
         self.form_group_box.setLayout(form_layout)
+
+        # (字段名, 表单控件设置函数, 类型转换)，供 update_form_data 按表分发
+        self._form_setters = (
+            ('tag_version', self.tag_version_spin.setValue, int),
+            ('filament_manufacturer', self.filament_manufacturer_edit.setText, str),
+            ('material_name', self.material_name_edit.setText, str),
+            ('color_name', self.color_name_edit.setText, str),
+            ('diameter_target', self.diameter_target_spin.setValue, int),
+            ('weight_nominal', self._set_weight_nominal, str),
+            ('print_temp', self.print_temp_spin.setValue, int),
+            ('bed_temp', self.bed_temp_spin.setValue, int),
+            ('density', self.density_spin.setValue, int),
+            ('serial_number', self.serial_number_edit.setText, str),
+            ('empty_spool_weight', self.empty_spool_weight_spin.setValue, int),
+        )
+        # 表单数据模型：控件内容变化时同步更新，write_tag 直接复制模型，无需逐个读取控件
+        # (标称重量在 write_tag 中单独校验转换；文本字段去除首尾空格)
+        self._tag_model = {}
+        for key, spin in (
+            ('tag_version', self.tag_version_spin),
+            ('diameter_target', self.diameter_target_spin),
+            ('print_temp', self.print_temp_spin),
+            ('bed_temp', self.bed_temp_spin),
+            ('density', self.density_spin),
+            ('empty_spool_weight', self.empty_spool_weight_spin),
+        ):
+            self._tag_model[key] = spin.value()
+            spin.valueChanged.connect(lambda value, key=key: self._tag_model.__setitem__(key, value))
+        for key, edit in (
+            ('filament_manufacturer', self.filament_manufacturer_edit),
+            ('material_name', self.material_name_edit),
+            ('color_name', self.color_name_edit),
+            ('serial_number', self.serial_number_edit),
+        ):
+            self._tag_model[key] = edit.text().strip()
+            edit.textChanged.connect(lambda text, key=key: self._tag_model.__setitem__(key, text.strip()))
         
     def setup_log_panel(self):
         """设置日志面板"""
@@ -707,16 +974,55 @@ class RFIDReaderApp(QMainWindow):
         self.log_panel.add_log("请连接RFID读写器以开始操作")
         
     def refresh_ports(self):
-        """刷新可用串口列表"""
-        self.port_combo.clear()
-        
-        ports = serial.tools.list_ports.comports()
-        for port in ports:
-            # 排除 COM1
-            if port.device.upper() == "COM1":
-                continue
-            self.port_combo.addItem(port.device)
-            
+        """刷新可用串口列表 (在线程池中枚举，短时间内重复点击直接复用上次的枚举结果)"""
+        self._port_scan_manual = True
+        if self._port_scan_pending:
+            return # 上一次枚举尚未完成，结果返回后会一并刷新
+        if time.monotonic() - self._ports_scanned_at < self.PORT_SCAN_CACHE_SEC:
+            self._port_scan_manual = False
+            self._log_port_count()
+            return
+        self._start_port_scan()
+
+    def _poll_ports(self):
+        """定时检测串口插拔 (已连接或上次枚举未完成时跳过)"""
+        if self._port_scan_pending or self.reader_thread.is_running:
+            return
+        self._start_port_scan()
+
+    def _start_port_scan(self):
+        """在线程池中枚举串口"""
+        # Windows 下枚举串口需要遍历设备信息，可能耗时数百毫秒，不在界面线程中执行
+        self._port_scan_pending = True
+        QThreadPool.globalInstance().start(self._port_scanner.run)
+
+    def _apply_ports(self, ports):
+        """在界面线程中更新串口下拉框 (只增删有变化的项)"""
+        manual = self._port_scan_manual
+        self._port_scan_pending = False
+        self._port_scan_manual = False
+        self._ports_scanned_at = time.monotonic()
+        if ports is None:
+            if manual:
+                self.log_panel.add_log("枚举串口失败")
+            return
+        changed = ports != self._last_ports
+        if changed:
+            # 更新期间屏蔽逐项的 currentIndexChanged，结束后若选中项变化只通知一次
+            previous = (self.port_combo.currentIndex(), self.port_combo.currentText())
+            self.port_combo.blockSignals(True)
+            for device in self._last_ports - ports:
+                self.port_combo.removeItem(self.port_combo.findText(device))
+            self.port_combo.addItems(sorted(ports - self._last_ports))
+            self.port_combo.blockSignals(False)
+            if (self.port_combo.currentIndex(), self.port_combo.currentText()) != previous:
+                self.port_combo.currentIndexChanged.emit(self.port_combo.currentIndex())
+            self._last_ports = ports
+        if manual or changed: # 定时检测只在串口列表变化时记录
+            self._log_port_count()
+
+    def _log_port_count(self):
+        """记录当前可用串口数量"""
         if self.port_combo.count() == 0:
             self.log_panel.add_log("未找到可用串口 (已排除 COM1)")
         else:
@@ -727,7 +1033,6 @@ class RFIDReaderApp(QMainWindow):
         if self.reader_thread.is_running:
             # 断开连接
             self.reader_thread.disconnect_reader()
-            self.connect_btn.setText("连接")
         else:
             # 连接设备
             port = self.port_combo.currentText()
@@ -735,23 +1040,36 @@ class RFIDReaderApp(QMainWindow):
                 QMessageBox.warning(self, "错误", "请先选择一个串口")
                 return
                 
-            baud_rate = int(self.baud_combo.currentText())
+            baud_rate = self.baud_combo.currentData()
             
-            # 尝试连接
-            success = self.reader_thread.connect_reader(port, baud_rate)
-            if success:
-                self.connect_btn.setText("断开")
+            # 串口在读写线程中打开，期间禁用连接按钮；
+            # 按钮与状态标签由 status_changed -> update_status 统一更新
+            self._shown_connected = None # 连接中，成功或失败都需要刷新界面
+            self.connect_btn.setEnabled(False)
+            self.connect_btn.setText("连接中…")
+            self.reader_thread.connect_reader(port, baud_rate)
                 
     def update_status(self, connected, message):
-        """更新连接状态"""
+        """更新连接状态 (连接按钮与状态标签只在状态实际变化时刷新)"""
+        self.connect_btn.setEnabled(True) # 连接尝试已结束
+        if connected == self._shown_connected:
+            return
+        self._shown_connected = connected
         if connected:
-            self.status_label.setText("状态： <font color='#4CAF50' style='font-size:16pt;'>●</font> 已连接")
+            self.status_label.setText(_STATUS_CONNECTED_HTML)
+            self.connect_btn.setText("断开")
         else:
-            self.status_label.setText("状态： <font color='#FF5252' style='font-size:16pt;'>●</font> 未连接")
+            self.status_label.setText(_STATUS_DISCONNECTED_HTML)
+            self._skip_write_confirm = False # 断开后重新连接时恢复写入确认
+            self.connect_btn.setText("连接") # 串口异常断开时同步按钮状态
             
     def add_log(self, message):
         """添加日志"""
         self.log_panel.add_log(message)
+
+    def add_logs(self, messages):
+        """批量添加日志"""
+        self.log_panel.add_logs(messages)
         
     def handle_continuous_checkbox_changed(self, state, checkbox_type):
         """处理连续操作复选框状态变化"""
@@ -767,7 +1085,9 @@ class RFIDReaderApp(QMainWindow):
 
         if source_checkbox.isChecked():
             if other_checkbox.isChecked():
-                other_checkbox.setChecked(False) # 确保互斥
+                # 确保互斥；屏蔽另一个复选框的信号，避免重入本函数 (下面会统一停止另一种连续操作)
+                with QSignalBlocker(other_checkbox):
+                    other_checkbox.setChecked(False)
             # 如果当前有其他类型的连续操作正在进行，则停止它
             if self.reader_thread.is_performing_continuous_action and \
                self.reader_thread.continuous_mode != checkbox_type:
@@ -854,43 +1174,29 @@ class RFIDReaderApp(QMainWindow):
             return
 
         # 收集表单数据
-        tag_data = {
-            'tag_version': self.tag_version_spin.value(),
-            'filament_manufacturer': self.filament_manufacturer_edit.text().strip(), # 去除首尾空格
-            'material_name': self.material_name_edit.text().strip(), # 去除首尾空格
-            'color_name': self.color_name_edit.text().strip(), # 去除首尾空格
-            'diameter_target': self.diameter_target_spin.value(),
-            'weight_nominal': weight_nominal_value, # 使用经过验证和转换的值
-            'print_temp': self.print_temp_spin.value(),
-            'bed_temp': self.bed_temp_spin.value(),
-            'density': self.density_spin.value(),
-            'serial_number': self.serial_number_edit.text().strip(), # 新增序列号
-            'empty_spool_weight': self.empty_spool_weight_spin.value() # 新增空线轴重量
-        }
+        tag_data = dict(self._tag_model)
+        tag_data['weight_nominal'] = weight_nominal_value # 使用经过验证和转换的值
         
-        # 定义校验函数
-        def is_valid_string_format(text):
-            return bool(re.fullmatch(r"[a-zA-Z0-9 -]*", text))
-
         # 验证必填字段和格式
         if not tag_data['filament_manufacturer']:
             QMessageBox.warning(self, "验证失败", "耗材制造商不能为空")
             return
-        if not is_valid_string_format(tag_data['filament_manufacturer']):
+        # 输入框已有校验器，但读取标签或加载配置时 setText 填入的内容不经过校验器，这里仍需检查
+        if not _VALID_STR.fullmatch(tag_data['filament_manufacturer']):
             QMessageBox.warning(self, "验证失败", "耗材制造商只能包含大小写字母、数字和横杠")
             return
 
         if not tag_data['material_name']:
             QMessageBox.warning(self, "验证失败", "耗材名称不能为空")
             return
-        if not is_valid_string_format(tag_data['material_name']):
+        if not _VALID_STR.fullmatch(tag_data['material_name']):
             QMessageBox.warning(self, "验证失败", "耗材名称只能包含大小写字母、数字和横杠")
             return
 
         if not tag_data['color_name']:
             QMessageBox.warning(self, "验证失败", "颜色名称不能为空")
             return
-        if not is_valid_string_format(tag_data['color_name']):
+        if not _VALID_STR.fullmatch(tag_data['color_name']):
             QMessageBox.warning(self, "验证失败", "颜色名称只能包含大小写字母、数字和横杠")
             return
             
@@ -930,16 +1236,32 @@ class RFIDReaderApp(QMainWindow):
             if self.reader_thread.is_performing_continuous_action:
                 self.reader_thread.stop_continuous_action()
                 
-            reply = QMessageBox.question(
-                self,
-                "确认写入",
-                "确定要写入标签数据吗？此操作将覆盖标签上的现有数据。",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                QMessageBox.StandardButton.No
-            )
-            if reply == QMessageBox.StandardButton.Yes:
+            if self._confirm_write():
                 self.reader_thread.write_tag(tag_data, channel_number)
+
+    def _confirm_write(self):
+        """单次写入前确认，勾选"本次连接不再提示"后直到断开连接前不再询问"""
+        if self._skip_write_confirm:
+            return True
+        box = QMessageBox(
+            QMessageBox.Icon.Question,
+            "确认写入",
+            "确定要写入标签数据吗？此操作将覆盖标签上的现有数据。",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            self
+        )
+        box.setDefaultButton(QMessageBox.StandardButton.No)
+        dont_ask_checkbox = QCheckBox("本次连接不再提示", box)
+        box.setCheckBox(dont_ask_checkbox)
+        if box.exec() != QMessageBox.StandardButton.Yes:
+            return False
+        self._skip_write_confirm = dont_ask_checkbox.isChecked()
+        return True
             
+    def on_tag_data_received(self, payload: bytes):
+        """在界面线程中解码读取到的标签数据并填入表单"""
+        self.update_form_data(decode_tag_data(payload))
+
     def update_form_data(self, data):
         """更新表单数据"""
         if not data: # 如果传入空数据 (例如 "选择耗材模板..." 选项)
@@ -955,53 +1277,31 @@ class RFIDReaderApp(QMainWindow):
             # self.density_spin.setValue(0)    # Or a sensible default
             return
 
-        # 更新新的字段
-        if 'tag_version' in data:
-            self.tag_version_spin.setValue(int(data['tag_version']))
-            
-        if 'filament_manufacturer' in data:
-            self.filament_manufacturer_edit.setText(str(data['filament_manufacturer']))
-        
-        if 'material_name' in data:
-            self.material_name_edit.setText(str(data['material_name']))
-            
-        if 'color_name' in data:
-            self.color_name_edit.setText(str(data['color_name']))
-            
-        if 'diameter_target' in data:
-            self.diameter_target_spin.setValue(int(data['diameter_target']))
-            
-        if 'weight_nominal' in data:
-            current_weight_text = str(data['weight_nominal'])
-            # 确保 QComboBox 中存在该选项，如果不存在，可以考虑是否添加或记录日志
-            index = self.weight_nominal_spin.findText(current_weight_text)
-            if index != -1:
-                self.weight_nominal_spin.setCurrentText(current_weight_text)
-            else:
-                # 如果配置中的重量值不在预设列表中，可以选择添加到列表或记录一个警告
-                # self.weight_nominal_spin.addItem(current_weight_text) # 动态添加
-                # self.weight_nominal_spin.setCurrentText(current_weight_text)
-                self.add_log(f"警告: 从标签读取的重量值 '{current_weight_text}' 不在预设列表中。")
-                # 可以选择将其设置为默认的 "选择重量..."
-                if self.weight_nominal_spin.count() > 0:
-                    self.weight_nominal_spin.setCurrentIndex(0)
-
-
-            
-        if 'print_temp' in data:
-            self.print_temp_spin.setValue(int(data['print_temp']))
-            
-        if 'bed_temp' in data:
-            self.bed_temp_spin.setValue(int(data['bed_temp']))
-            
-        if 'density' in data:
-            self.density_spin.setValue(int(data['density']))
-            
-        if 'serial_number' in data:
-            self.serial_number_edit.setText(str(data['serial_number']))
-            
-        if 'empty_spool_weight' in data:
-            self.empty_spool_weight_spin.setValue(int(data['empty_spool_weight']))
+        get = data.get
+        # 批量设置期间暂停表单重绘，全部字段设置完后只重绘一次
+        self.form_group_box.setUpdatesEnabled(False)
+        try:
+            for key, setter, cast in self._form_setters:
+                value = get(key)
+                if value is not None:
+                    setter(cast(value))
+        finally:
+            self.form_group_box.setUpdatesEnabled(True)
+
+    def _set_weight_nominal(self, current_weight_text):
+        """设置标称重量下拉框"""
+        # 确保 QComboBox 中存在该选项，如果不存在，可以考虑是否添加或记录日志
+        index = self.weight_nominal_spin.findText(current_weight_text)
+        if index != -1:
+            self.weight_nominal_spin.setCurrentIndex(index)
+        else:
+            # 如果配置中的重量值不在预设列表中，可以选择添加到列表或记录一个警告
+            # self.weight_nominal_spin.addItem(current_weight_text) # 动态添加
+            # self.weight_nominal_spin.setCurrentText(current_weight_text)
+            self.add_log(f"警告: 从标签读取的重量值 '{current_weight_text}' 不在预设列表中。")
+            # 可以选择将其设置为默认的 "选择重量..."
+            if self.weight_nominal_spin.count() > 0:
+                self.weight_nominal_spin.setCurrentIndex(0)
 
     def clear_tag_form(self):
         """清空标签信息表单至其最小值或空白状态"""
@@ -15,6 +15,16 @@ PREDEFINED_READ_COMMANDS = {
     0x07: bytes([0xEF, 0x06, 0x11, 0x07, 0x00, 0xFE]), # 读取通道8
 }
 
+def calculate_bcc(data: bytes) -> int:
+    """
+    计算BCC校验值：从帧头到DATA最后一个字节逐字节异或后取反。
+    data: 参与校验的字节 (FH 到 DATA)。
+    """
+    bcc = 0
+    for byte in data:
+        bcc ^= byte
+    return (~bcc) & 0xFF
+
 def construct_read_command(channel_data_byte: int) -> bytes | None:
     """
     构建指定通道的读取命令。
@@ -65,8 +75,11 @@ def parse_rfid_response(response_bytes: bytes) -> bytes | None:
         # 如果严格按此定义，那么len_val应该等于len(response_bytes)
         # return None # 暂时不因长度严格不符而退出，以便处理文档中的示例
 
-    # 检查BCC (这里我们不重新计算BCC，因为计算规则不明确，仅作结构性检查)
-    # 实际应用中应严格校验BCC
+    # 检查BCC (从帧头到DATA最后一个字节异或取反)
+    calculated_bcc = calculate_bcc(response_bytes[:-2])
+    if bcc != calculated_bcc:
+        print(f"日志：BCC校验不一致。接收 {bcc:#04x}, 计算 {calculated_bcc:#04x}。")
+        # return None # 与LEN检查一致，暂时只记录不退出
 
     if cmdc != 0x11: # 假设这是对0x11命令的响应
         print(f"日志：非预期的命令码CMDC: {cmdc:#04x} in response。")
@@ -237,10 +250,7 @@ def construct_write_command(tag_data: dict, channel_data_byte: int) -> bytes | N
     #    BCC的计算方法需要参考您的协议文档。
     #    常见的简单方法是异或校验 (XOR sum of bytes) 或 取反的异或校验。
     #    假设是 "取反的异或校验": BCC = NOT (byte1 ^ byte2 ^ ... ^ byteN)
-    bcc_value = 0
-    for byte_val in bcc_calculation_part:
-        bcc_value ^= byte_val
-    bcc_value = (~bcc_value) & 0xFF  # 取反并确保是单字节
+    bcc_value = calculate_bcc(bcc_calculation_part)
 
     # 6. 组装完整命令帧
     command_frame = bytes([FH, frame_len, CMDC_WRITE]) + data_field + bytes([bcc_value, EOF])
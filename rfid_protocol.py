@@ -9,11 +9,72 @@ RFID读写器通信协议模拟模块
 import time
 import json
 import random
-import binascii
 import struct
 import datetime
 import serial
-from read_rfid_tag import construct_read_command # 导入正确的命令构建函数
+from read_rfid_tag import construct_read_command, calculate_bcc # 导入正确的命令构建函数
+
+FRAME_HEADER = 0xEF
+FRAME_END = 0xFE
+MIN_FRAME_LEN = 6 # FH, LEN, CMDC, DATA(至少1字节), BCC, EOF
+
+# 112字节标签数据布局 (大端):
+# Tag Version(2) | Filament Manufacturer(16, ASCII) | Material Name(16, ASCII) | Color Name(32, ASCII) |
+# Diameter Target(2) | Weight Nominal(2) | Print Temp(2) | Bed Temp(2) | Density(2) |
+# Serial Number(16, ASCII) | Empty Spool Weight(2) | 保留(18, 填0)
+TAG_DATA_STRUCT = struct.Struct('>H16s16s32sHHHHH16sH18x')
+TAG_DATA_MIN_LEN = 76 # 至少要包含到 Density 为止的主要字段才能解析
+
+def decode_tag_data(payload: bytes) -> dict:
+    """将标签数据解码为字段字典，不足112字节的部分按0处理"""
+    (tag_version, manufacturer, material_name, color_name, diameter_target, weight_nominal,
+     print_temp, bed_temp, density, serial_number, empty_spool_weight) = \
+        TAG_DATA_STRUCT.unpack_from(payload.ljust(TAG_DATA_STRUCT.size, b'\x00'))
+    return {
+        'tag_version': tag_version,
+        'filament_manufacturer': manufacturer.decode('ascii', errors='ignore').strip('\x00').strip(),
+        'material_name': material_name.decode('ascii', errors='ignore').strip('\x00').strip(),
+        'color_name': color_name.decode('ascii', errors='ignore').strip('\x00').strip(),
+        'diameter_target': diameter_target,
+        'weight_nominal': weight_nominal,
+        'print_temp': print_temp,
+        'bed_temp': bed_temp,
+        'density': density,
+        'serial_number': serial_number.decode('ascii', errors='replace').rstrip('\x00'),
+        'empty_spool_weight': empty_spool_weight,
+    }
+
+def scan_frames(buf) -> tuple:
+    """
+    在字节缓冲区 (bytes/bytearray) 中查找完整的 EF...FE 帧，不修改 buf。
+    返回 (spans, consumed)：spans 是各完整帧的 (起始, 结束) 下标列表，
+    consumed 是可以从缓冲区头部丢弃的字节数 (已完成的帧和帧头之前的杂散字节)。
+    """
+    spans = []
+    pos = 0
+    size = len(buf)
+    while size - pos >= 2:
+        if buf[pos] != FRAME_HEADER:
+            # 用 find (memchr) 一次跳过帧头之前的所有杂散字节
+            pos = buf.find(FRAME_HEADER, pos + 1)
+            if pos < 0:
+                pos = size
+            continue
+
+        frame_len = buf[pos + 1] # LEN: 整个数据帧的长度
+        if frame_len < MIN_FRAME_LEN:
+            pos += 1 # LEN 非法，说明这不是真正的帧头
+            continue
+        if size - pos < frame_len:
+            break # 帧尚未接收完整
+
+        if buf[pos + frame_len - 1] != FRAME_END:
+            pos += 1 # 帧尾不匹配，从下一个字节重新同步
+            continue
+
+        spans.append((pos, pos + frame_len))
+        pos += frame_len
+    return spans, pos
 
 class RFIDProtocol:
     """RFID读写器通信协议处理类"""
@@ -28,15 +89,81 @@ class RFIDProtocol:
     # STATUS_READ_ERROR = 0x03
     # STATUS_WRITE_ERROR = 0x04
     
+    READ_RESPONSE_TIMEOUT = 1.0  # 等待读取响应的最长时间（秒）
+    WRITE_RESPONSE_TIMEOUT = 2.0  # 写入操作可能需要更长时间（秒）
+
     def __init__(self, serial_port=None, log_emitter=None):
         """初始化RFID协议处理器"""
         self.serial_port = serial_port
         self.log_emitter = log_emitter
-        
+        self._rx_buffer = bytearray() # 接收缓冲区，保存尚未组成完整帧的字节
+        self._reader = self._read_once # 按长度读取响应数据的函数 reader(n, timeout)
+        self._stop = None # 置位后 (threading.Event) 立即放弃等待响应
+
     def set_serial(self, serial_port):
         """设置串口"""
         self.serial_port = serial_port
-        
+        self._rx_buffer.clear()
+
+    def set_reader(self, reader):
+        """设置读取函数 reader(n, timeout)，由调用方负责在截止时间内尽量读满 n 个字节"""
+        self._reader = reader
+
+    def set_stop_event(self, stop):
+        """设置停止事件，置位后正在等待的响应读取立即返回 None"""
+        self._stop = stop
+
+    def _read_once(self, n: int, timeout: float) -> bytes:
+        """默认读取函数：单次读取，受串口本身的读超时限制"""
+        return self.serial_port.read(n)
+
+    def feed(self, data: bytes) -> list:
+        """
+        将串口收到的字节追加到接收缓冲区，并取出其中所有完整的 EF...FE 帧。
+        不完整的帧保留在缓冲区中，等待后续数据到达后继续拼接。
+        """
+        self._rx_buffer.extend(data)
+        spans, consumed = scan_frames(self._rx_buffer)
+        if spans:
+            # 通过 memoryview 切片，每帧只复制一次；视图须在缓冲区缩短前释放
+            with memoryview(self._rx_buffer) as view:
+                frames = [view[start:end].tobytes() for start, end in spans]
+        else:
+            frames = []
+        # 原地丢弃已处理的字节，缓冲区对象及其内存被重复使用
+        del self._rx_buffer[:consumed]
+        return frames
+
+    def read_available(self) -> bytes:
+        """
+        一次性读取串口缓冲区中所有已到达的字节。
+        缓冲区为空时阻塞等待至少1个字节，最长等待一个串口读超时周期；
+        被唤醒后再把等待期间陆续到达的字节一并取出，避免一帧被拆成多次循环处理。
+        """
+        data = self.serial_port.read(self.serial_port.in_waiting or 1)
+        if data:
+            waiting = self.serial_port.in_waiting
+            if waiting:
+                data += self.serial_port.read(waiting)
+        return data
+
+    def _missing_frame_bytes(self) -> int:
+        """返回拼出当前帧还缺少的字节数 (帧头和LEN未到齐时只请求这两个字节)"""
+        if len(self._rx_buffer) < 2:
+            return 2 - len(self._rx_buffer)
+        return max(self._rx_buffer[1] - len(self._rx_buffer), 1)
+
+    def _read_response(self, timeout: float):
+        """按帧长度读取串口数据直到拼出一个完整帧，超时或停止事件置位时返回 None"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stop is not None and self._stop.is_set()):
+                return None
+            frames = self.feed(self._reader(self._missing_frame_bytes(), remaining))
+            if frames:
+                return frames[0]
+
     # _calculate_checksum, _build_packet, _parse_packet 是旧协议 (AA 55...) 的辅助方法
     # 在新的 EF...FE 协议下，命令构建由 construct_read_command 处理，
     # 响应解析由 read_rfid_tag.parse_rfid_response 处理 (在 main.py 中调用)
@@ -56,19 +183,17 @@ class RFIDProtocol:
         try:
             self.serial_port.reset_input_buffer()
             self.serial_port.reset_output_buffer()
+            self._rx_buffer.clear() # 丢弃之前残留的不完整帧
             
-            # self.log_message.emit(f"RFIDProtocol 发送命令: {binascii.hexlify(command_to_send).decode('ascii').upper()}") # 若需在此处日志
+            # self.log_message.emit(f"RFIDProtocol 发送命令: {command_to_send.hex().upper()}") # 若需在此处日志
             bytes_written = self.serial_port.write(command_to_send)
             if bytes_written != len(command_to_send):
                 return False, f"串口写入不足: 预期 {len(command_to_send)}, 实际 {bytes_written}"
 
-            # 等待设备响应。串口本身的超时设置 (timeout=1 in main.py) 会在read时起作用。
-            # 增加一个短暂延时确保设备有时间处理并开始发送。
-            time.sleep(0.3) 
-
-            if self.serial_port.in_waiting > 0:
-                response_bytes = self.serial_port.read(self.serial_port.in_waiting)
-                # self.log_message.emit(f"RFIDProtocol 收到原始数据: {binascii.hexlify(response_bytes).decode('ascii').upper()}") # 若需在此处日志
+            # 等待设备响应，收到完整的响应帧后立即返回
+            response_bytes = self._read_response(self.READ_RESPONSE_TIMEOUT)
+            if response_bytes:
+                # self.log_message.emit(f"RFIDProtocol 收到原始数据: {response_bytes.hex().upper()}") # 若需在此处日志
                 return True, response_bytes
             else:
                 return False, "读取响应超时或无数据 (串口缓冲区无数据)"
@@ -83,113 +208,63 @@ class RFIDProtocol:
     def _tag_data_to_bytes(self, tag_data: dict) -> bytes:
         """
         将标签数据字典转换为符合RFID编码规则的112字节数据。
-        前76字节根据提供的字段填充，后36字节用0x00填充。
+        使用预编译的 TAG_DATA_STRUCT 一次完成所有字段的编码，字符串字段由 's' 格式自动截断/补0。
         """
-        buffer = bytearray()
-        
-        # Tag Version (2 bytes, uint16, big-endian)
-        buffer.extend(struct.pack('>H', int(tag_data.get('tag_version', 0))))
-        
-        # Filament Manufacturer (16 bytes, ASCII, right-padded with \x00)
-        manufacturer = tag_data.get('filament_manufacturer', '')
-        buffer.extend(manufacturer.encode('ascii', errors='ignore')[:16].ljust(16, b'\x00'))
-        
-        # Material Name (16 bytes, ASCII, right-padded with \x00)
-        material_name = tag_data.get('material_name', '')
-        buffer.extend(material_name.encode('ascii', errors='ignore')[:16].ljust(16, b'\x00'))
-        
-        # Color Name (32 bytes, ASCII, right-padded with \x00)
-        color_name = tag_data.get('color_name', '')
-        buffer.extend(color_name.encode('ascii', errors='ignore')[:32].ljust(32, b'\x00'))
-        
-        # Diameter (Target) (2 bytes, uint16, big-endian)
-        buffer.extend(struct.pack('>H', int(tag_data.get('diameter_target', 0))))
-        
-        # Weight (Nominal, grams) (2 bytes, uint16, big-endian)
-        buffer.extend(struct.pack('>H', int(tag_data.get('weight_nominal', 0))))
-        
-        # Print Temp (C) (2 bytes, uint16, big-endian)
-        buffer.extend(struct.pack('>H', int(tag_data.get('print_temp', 0))))
-        
-        # Bed Temp (C) (2 bytes, uint16, big-endian)
-        buffer.extend(struct.pack('>H', int(tag_data.get('bed_temp', 0))))
-        
-        # Density (2 bytes, uint16, big-endian)
-        buffer.extend(struct.pack('>H', int(tag_data.get('density', 0))))
-        
-        # Serial Number (16 bytes, ASCII, right-padded with \x00) - Optional field
-        serial_number = tag_data.get('serial_number', '')
-        buffer.extend(serial_number.encode('ascii', errors='ignore')[:16].ljust(16, b'\x00'))
-        
-        # Empty Spool Weight (2 bytes, uint16, big-endian) - Optional field
-        buffer.extend(struct.pack('>H', int(tag_data.get('empty_spool_weight', 0))))
-        
-        # 当前总字节数: 2+16+16+32+2+2+2+2+2+16+2 = 94字节
-        # 还有其他可选字段，但暂时先填充0
-        # 填充到112字节
-        if len(buffer) < 112:
-            buffer.extend(b'\x00' * (112 - len(buffer)))
-        
-        return bytes(buffer[:112]) #确保正好112字节
+        return TAG_DATA_STRUCT.pack(
+            int(tag_data.get('tag_version', 0)),
+            tag_data.get('filament_manufacturer', '').encode('ascii', errors='ignore'),
+            tag_data.get('material_name', '').encode('ascii', errors='ignore'),
+            tag_data.get('color_name', '').encode('ascii', errors='ignore'),
+            int(tag_data.get('diameter_target', 0)),
+            int(tag_data.get('weight_nominal', 0)),
+            int(tag_data.get('print_temp', 0)),
+            int(tag_data.get('bed_temp', 0)),
+            int(tag_data.get('density', 0)),
+            tag_data.get('serial_number', '').encode('ascii', errors='ignore'),
+            int(tag_data.get('empty_spool_weight', 0)),
+        )
 
-    def write_tag(self, tag_data: dict, channel: int): # channel is 0-indexed
-        """写入标签信息，使用 EF...FE 协议"""
+    def construct_write_command(self, tag_data: dict, channel: int) -> bytes: # channel is 0-indexed
+        """构建写入命令帧: FH, LEN, CMDC(0x12), Channel, 112字节数据, BCC, EOF"""
+        data_to_write_bytes = self._tag_data_to_bytes(tag_data) # 112字节数据
+        LEN_VAL = 6 + len(data_to_write_bytes) # 6 = FH,LEN,CMDC,Channel,BCC,EOF，即 0x76
+        temp_frame_part = bytes((0xEF, LEN_VAL, 0x12, channel)) + data_to_write_bytes
+        return temp_frame_part + bytes((calculate_bcc(temp_frame_part), 0xFE))
+
+    def write_tag(self, tag_data: dict, channel: int, command_to_send: bytes = None): # channel is 0-indexed
+        """
+        写入标签信息，使用 EF...FE 协议。
+        command_to_send 为预先用 construct_write_command 构建的命令帧 (连续写入时数据不变，只需构建一次)。
+        """
         if not self.serial_port or not self.serial_port.is_open:
             return False, "串口未连接或未打开"
 
         try:
-            data_to_write_bytes = self._tag_data_to_bytes(tag_data) # 112字节数据
-            
             FH = b'\xEF'
-            LEN_VAL = 6 + len(data_to_write_bytes) # 6 = FH,LEN,CMDC,Channel,BCC,EOF
-            LEN = struct.pack('B', LEN_VAL) # LEN_VAL should be 6 + 112 = 118 (0x76)
             CMDC = b'\x12' # 写命令
-            CHANNEL_BYTE = struct.pack('B', channel)
             EOF = b'\xFE'
-
-            # 计算BCC
-            temp_frame_part = FH + LEN + CMDC + CHANNEL_BYTE + data_to_write_bytes
-            bcc_val = 0
-            for byte_val in temp_frame_part:
-                bcc_val ^= byte_val
-            BCC = struct.pack('B', (~bcc_val) & 0xFF)
-
-            command_to_send = temp_frame_part + BCC + EOF
+            if command_to_send is None:
+                command_to_send = self.construct_write_command(tag_data, channel)
 
             if self.log_emitter:
-                self.log_emitter.emit(f"发送写入命令 (通道 {channel + 1}): {binascii.hexlify(command_to_send).decode('ascii').upper()}")
+                self.log_emitter.emit(f"发送写入命令 (通道 {channel + 1}): {command_to_send.hex().upper()}")
 
             self.serial_port.reset_input_buffer()
             self.serial_port.reset_output_buffer()
+            self._rx_buffer.clear() # 丢弃之前残留的不完整帧
             
             bytes_written = self.serial_port.write(command_to_send)
             if bytes_written != len(command_to_send):
                 return False, f"串口写入不足: 预期 {len(command_to_send)}, 实际 {bytes_written}"
 
-            # 写入操作可能需要更长时间，增加等待并多次检查
-            max_wait_time = 2.0  # 最多等待2秒
-            check_interval = 0.1  # 每100ms检查一次
-            elapsed_time = 0
-            response_bytes = b''
-            
-            while elapsed_time < max_wait_time:
-                time.sleep(check_interval)
-                elapsed_time += check_interval
-                
-                if self.serial_port.in_waiting > 0:
-                    # 读取所有可用数据
-                    response_bytes = self.serial_port.read(self.serial_port.in_waiting)
-                    # 等待一小段时间确保数据完整
-                    time.sleep(0.05)
-                    if self.serial_port.in_waiting > 0:
-                        response_bytes += self.serial_port.read(self.serial_port.in_waiting)
-                    break
+            # 写入操作可能需要更长时间，收到完整的响应帧后立即返回
+            response_bytes = self._read_response(self.WRITE_RESPONSE_TIMEOUT) or b''
             
             if response_bytes:
                 
                 # 新增：记录写入操作的原始响应字节流
                 if self.log_emitter:
-                    self.log_emitter.emit(f"接收到写入响应帧 (通道 {channel + 1}): {binascii.hexlify(response_bytes).decode('ascii').upper()}")
+                    self.log_emitter.emit(f"接收到写入响应帧 (通道 {channel + 1}): {response_bytes.hex().upper()}")
                 
                 # 解析响应 (预期7字节: EF, 07, 12, STA, CH, BCC, FE)
                 if len(response_bytes) == 7 and \
@@ -204,10 +279,7 @@ class RFIDProtocol:
                     resp_bcc_received = response_bytes[5]
 
                     bcc_check_data = response_bytes[0:5] # FH, LEN, CMDC, STA, CH
-                    calculated_bcc_val = 0
-                    for b_val in bcc_check_data:
-                        calculated_bcc_val ^= b_val
-                    calculated_bcc_byte = (~calculated_bcc_val) & 0xFF
+                    calculated_bcc_byte = calculate_bcc(bcc_check_data)
                     
                     if calculated_bcc_byte == resp_bcc_received:
                         if resp_sta == 0x00:
@@ -221,7 +293,7 @@ class RFIDProtocol:
                     else:
                         return False, f"通道 {channel + 1} 写入响应BCC校验失败. Recv: {resp_bcc_received:02X}, Calc: {calculated_bcc_byte:02X}"
                 else:
-                    return False, f"通道 {channel + 1} 写入响应帧格式错误或长度不足. 收到: {binascii.hexlify(response_bytes).decode('ascii').upper()}"
+                    return False, f"通道 {channel + 1} 写入响应帧格式错误或长度不足. 收到: {response_bytes.hex().upper()}"
             else:
                 return False, f"通道 {channel + 1} 写入后无响应或响应超时"
 
@@ -251,7 +323,7 @@ if __name__ == "__main__":
     # # 模拟调用 _tag_data_to_bytes
     # try:
     #     byte_data = protocol._tag_data_to_bytes(sample_tag_data)
-    # print(f"Generated byte data ({len(byte_data)} bytes): {binascii.hexlify(byte_data).decode('ascii')}")
+    # print(f"Generated byte data ({len(byte_data)} bytes): {byte_data.hex()}")
     # except Exception as e:
     #     print(f"Error in _tag_data_to_bytes test: {e}")
 